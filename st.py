@@ -2,11 +2,14 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import json
+import re
 import base64
 from io import BytesIO
 import plotly.express as px
 import plotly.graph_objects as go
+from dataclasses import dataclass
 from datetime import datetime
 
 # Configure page
@@ -18,7 +21,7 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main-header {
         font-size: 3rem;
@@ -48,7 +51,8 @@ st.markdown("""
         color: #0c5460;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.html(CUSTOM_CSS)
 
 st.markdown('<h1 class="main-header">📊 Comment Analysis Dashboard</h1>', unsafe_allow_html=True)
 
@@ -70,14 +74,411 @@ uploaded_csv = st.sidebar.file_uploader(
     help="Upload the CSV file with sentiment analysis results"
 )
 
+# Welcome screen content
+WELCOME_MARKDOWN = """
+## 🚀 Welcome to the Comment Analysis Dashboard!
+
+This dashboard displays results from sentiment analysis processed in Google Colab.
+
+### 📋 How to Use:
+
+1. **Process your data in Google Colab** using the provided notebook
+2. **Download the results** (JSON or CSV format)  
+3. **Upload the results** using the sidebar file uploader
+4. **Explore your analysis** with interactive visualizations
+
+### 📁 Supported File Formats:
+
+- **JSON**: Complete analysis report with visualizations (recommended)
+- **CSV**: Processed data with sentiment scores and summaries
+
+### 🎯 What You'll Get:
+
+- 📊 **Interactive dashboards** with key metrics
+- 📈 **Dynamic visualizations** (charts, graphs, word clouds)
+- 🔍 **Data filtering** and exploration tools  
+- 💾 **Download options** for filtered results
+- 📋 **Detailed statistics** and sample data
+
+### 🔄 Colab + Streamlit Pipeline Benefits:
+
+✅ **Fast processing** - Heavy ML work done in Colab with GPU support  
+✅ **Quick deployment** - Lightweight Streamlit app loads instantly  
+✅ **No timeouts** - Pre-processed data means no waiting  
+✅ **Easy sharing** - Share results without re-processing  
+✅ **Cost effective** - Free Colab processing + free Streamlit hosting  
+
+---
+
+**Ready to get started?** Upload your analysis results using the sidebar! 👈
+"""
+
+SAMPLE_DATA = pd.DataFrame({
+    'comment': [
+        'This product is amazing! Highly recommend it.',
+        'Not satisfied with the quality. Could be better.',  
+        'Great customer service and fast delivery.'
+    ],
+    'sentiment_label': ['POSITIVE', 'NEGATIVE', 'POSITIVE'],
+    'sentiment_score': [0.995, 0.892, 0.967],
+    'summary': [
+        'Product is amazing and recommended.',
+        'Quality not satisfactory, needs improvement.',
+        'Great service and fast delivery.'
+    ]
+})
+
+# Maximum number of rows sent to the browser in a single table render
+MAX_DISPLAY_ROWS = 5000
+
+# Common stop words excluded from word frequency analysis
+STOP_WORDS = frozenset({
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'from', 'up', 'about', 'into', 'through', 'during', 'before', 'after',
+    'above', 'below', 'between', 'among'
+})
+
+def optimize_dtypes(df):
+    """Store low-cardinality label columns as categoricals"""
+    if 'sentiment_label' in df.columns:
+        df['sentiment_label'] = df['sentiment_label'].astype('category')
+    # Recorded once so the filter step knows whether a 0.0 threshold drops any rows
+    if 'sentiment_score' in df.columns:
+        df.attrs['score_has_nans'] = bool(df['sentiment_score'].hasnans)
+    return df
+
+# Cached loaders - keyed on the uploaded file's bytes so reruns skip re-parsing
+@st.cache_data(max_entries=8, ttl="1h")
+def load_json(file_bytes):
+    """Parse an uploaded analysis JSON file"""
+    results_data = json.loads(file_bytes)
+    
+    # Parse the analysis date once at load time
+    metadata = results_data.get('metadata') if isinstance(results_data, dict) else None
+    if isinstance(metadata, dict) and isinstance(metadata.get('analysis_date'), str):
+        metadata['analysis_date'] = datetime.fromisoformat(metadata['analysis_date'].replace('Z', '+00:00'))
+    
+    return results_data
+
+@st.cache_data(max_entries=8, ttl="1h")
+def load_csv(file_bytes):
+    """Parse an uploaded results CSV file with the multithreaded PyArrow reader"""
+    df = pd.read_csv(BytesIO(file_bytes), engine='pyarrow', dtype_backend='pyarrow')
+    return optimize_dtypes(df)
+
+def compute_summary(df):
+    """Build metadata and sentiment summary for CSV results"""
+    metadata = {
+        'total_comments': len(df),
+        'analysis_date': datetime.now()
+    }
+    
+    # Calculate sentiment analysis summary if available
+    sentiment_analysis = {}
+    if 'sentiment_label' in df.columns:
+        sentiment_counts = df['sentiment_label'].value_counts()
+        total = len(df)
+        sentiment_analysis = {
+            'distribution': sentiment_counts.to_dict(),
+            'average_confidence': df['sentiment_score'].mean() if 'sentiment_score' in df.columns else 0,
+            'positive_percentage': (sentiment_counts.get('POSITIVE', sentiment_counts.get('positive', 0)) / total) * 100,
+            'negative_percentage': (sentiment_counts.get('NEGATIVE', sentiment_counts.get('negative', 0)) / total) * 100
+        }
+    
+    return metadata, sentiment_analysis
+
+def load_json_results(file_bytes):
+    """Parse an uploaded analysis JSON and build its results DataFrame"""
+    results_data = load_json(file_bytes)
+    df = None
+    if isinstance(results_data, dict) and 'data' in results_data:
+        df = optimize_dtypes(pd.DataFrame(results_data['data']))
+    
+    # Decode the word cloud image once per upload
+    visualizations = results_data.get('visualizations') if isinstance(results_data, dict) else None
+    if isinstance(visualizations, dict) and 'wordcloud' in visualizations:
+        try:
+            visualizations['wordcloud'] = base64.b64decode(visualizations['wordcloud'])
+        except (TypeError, ValueError) as e:
+            visualizations['wordcloud_error'] = str(e)
+            del visualizations['wordcloud']
+    
+    return results_data, df
+
+def load_csv_results(file_bytes):
+    """Parse an uploaded results CSV and build its metadata and sentiment summary"""
+    df = load_csv(file_bytes)
+    return df, compute_summary(df)
+
+def load_uploaded(uploaded_file, loader):
+    """Load an uploaded file once per upload and reuse the result across reruns"""
+    # Keyed on the upload's file_id so reruns skip both re-parsing and cache hashing
+    if st.session_state.get('loaded_id') != uploaded_file.file_id:
+        st.session_state.loaded_data = loader(uploaded_file.getvalue())
+        st.session_state.loaded_id = uploaded_file.file_id
+    return st.session_state.loaded_data
+
+@st.cache_data(max_entries=16)
+def top_words(_comments, filter_key, k=20):
+    """Return the k most frequent non-stop words in a series of comments, cached on the filter key"""
+    tokens = _comments.astype(str).str.lower().str.findall(r"[a-z]{3,}", flags=re.ASCII)
+    words = tokens.explode().dropna()
+    
+    # Remove common stop words
+    words = words[~words.isin(STOP_WORDS)]
+    
+    return words.value_counts().head(k)
+
+@dataclass
+class Derived:
+    """Aggregates of the filtered results shared by the visualization tabs"""
+    counts: pd.Series = None
+    describe: pd.Series = None
+    by_group: pd.DataFrame = None
+    hist_counts: np.ndarray = None
+    hist_edges: np.ndarray = None
+
+@st.cache_data(max_entries=16)
+def compute_derived(_filtered_df, filter_key):
+    """Compute per-filter-state aggregates, cached on the upload id and filter state"""
+    derived = Derived()
+    
+    if 'sentiment_label' in _filtered_df.columns:
+        counts = _filtered_df['sentiment_label'].value_counts()
+        derived.counts = counts[counts > 0]
+    
+    if 'sentiment_score' in _filtered_df.columns:
+        scores = _filtered_df['sentiment_score']
+        derived.describe = scores.describe()
+        # Binned server-side so only bin counts are sent to the browser
+        derived.hist_counts, derived.hist_edges = np.histogram(scores.dropna().to_numpy(), bins=20)
+        
+        if 'sentiment_label' in _filtered_df.columns:
+            by_group = _filtered_df.groupby('sentiment_label', observed=True)['sentiment_score'].describe(percentiles=[.25, .5, .75])
+            derived.by_group = by_group[by_group['count'] > 0]
+    
+    return derived
+
+def aggregates_to_json(derived):
+    """Serialize filtered aggregates (counts, histogram bins, quartiles) as JSON bytes"""
+    aggregates = {}
+    if derived.counts is not None:
+        aggregates['sentiment_counts'] = {str(label): int(count) for label, count in derived.counts.items()}
+    if derived.describe is not None:
+        aggregates['score_statistics'] = json.loads(derived.describe.to_json())
+        aggregates['score_histogram'] = {
+            'counts': derived.hist_counts.tolist(),
+            'bin_edges': derived.hist_edges.tolist()
+        }
+    if derived.by_group is not None:
+        aggregates['score_quartiles_by_sentiment'] = json.loads(derived.by_group.to_json(orient='index'))
+    return json.dumps(aggregates, indent=2).encode('utf-8')
+
+def display_dataframe_quickly(df, max_rows=MAX_DISPLAY_ROWS):
+    """Render a DataFrame, sending only a window of rows for large frames"""
+    if len(df) <= max_rows:
+        st.dataframe(df, use_container_width=True)
+        return
+    
+    page_count = -(-len(df) // max_rows)
+    page = st.slider(
+        "Page",
+        min_value=1,
+        max_value=page_count,
+        value=1,
+        help=f"Large results are shown {max_rows:,} rows at a time"
+    )
+    start = (page - 1) * max_rows
+    end = min(start + max_rows, len(df))
+    st.caption(f"Rows {start + 1:,}-{end:,} of {len(df):,}")
+    st.dataframe(df.iloc[start:end], use_container_width=True)
+
+@st.cache_data(max_entries=8)
+def to_csv_bytes(_df, data_key):
+    """Encode a DataFrame as UTF-8 CSV bytes for download, cached on data_key"""
+    return _df.to_csv(index=False).encode('utf-8')
+
+# Cached figure builders - figures are shared across reruns, so callers must not mutate them
+@st.cache_resource(max_entries=16)
+def build_sentiment_charts(sentiment_counts):
+    """Build the sentiment distribution bar and pie charts"""
+    fig = px.bar(
+        x=sentiment_counts.index,
+        y=sentiment_counts.values,
+        title="Sentiment Distribution",
+        color=sentiment_counts.values,
+        color_continuous_scale="viridis",
+        labels={'x': 'Sentiment', 'y': 'Count'}
+    )
+    fig.update_layout(showlegend=False)
+    
+    fig_pie = px.pie(
+        values=sentiment_counts.values,
+        names=sentiment_counts.index,
+        title="Sentiment Proportion"
+    )
+    return fig, fig_pie
+
+@st.cache_resource(max_entries=16)
+def build_histogram(counts, edges):
+    """Build the confidence score histogram from precomputed bins"""
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges)
+    ))
+    fig.update_layout(
+        title="Distribution of Confidence Scores",
+        xaxis_title="Confidence Score",
+        yaxis_title="Frequency",
+        bargap=0
+    )
+    return fig
+
+@st.cache_resource(max_entries=16)
+def build_box(score_stats):
+    """Build the confidence score box plot from per-sentiment quartiles"""
+    fig = go.Figure()
+    for sentiment, row in score_stats.iterrows():
+        fig.add_trace(go.Box(
+            name=str(sentiment),
+            x=[str(sentiment)],
+            q1=[row['25%']],
+            median=[row['50%']],
+            q3=[row['75%']],
+            mean=[row['mean']],
+            lowerfence=[row['min']],
+            upperfence=[row['max']]
+        ))
+    fig.update_layout(
+        title="Confidence Scores by Sentiment",
+        xaxis_title="Sentiment",
+        yaxis_title="Confidence Score",
+        showlegend=False
+    )
+    return fig
+
+@st.cache_resource(max_entries=16)
+def build_word_bar(word_freq):
+    """Build the horizontal bar chart of most common words"""
+    fig = px.bar(
+        x=word_freq.values,
+        y=word_freq.index,
+        orientation='h',
+        title="Top 20 Most Common Words",
+        labels={'x': 'Frequency', 'y': 'Words'}
+    )
+    fig.update_layout(height=600)
+    return fig
+
+# Tab renderers - only the selected view is built on each run
+def render_sentiment_tab(derived):
+    """Render the sentiment distribution tab"""
+    if derived.counts is not None:
+        fig, fig_pie = build_sentiment_charts(derived.counts)
+        
+        # Interactive bar chart
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Pie chart
+        st.plotly_chart(fig_pie, use_container_width=True)
+    else:
+        st.warning("No sentiment data available for visualization")
+
+def render_scores_tab(derived):
+    """Render the confidence scores tab"""
+    if derived.describe is not None:
+        # Histogram of confidence scores
+        st.plotly_chart(build_histogram(derived.hist_counts, derived.hist_edges), use_container_width=True)
+        
+        # Box plot by sentiment
+        if derived.by_group is not None:
+            fig_box = build_box(derived.by_group)
+            st.plotly_chart(fig_box, use_container_width=True)
+    else:
+        st.warning("No confidence score data available")
+
+def render_words_tab(filtered_df, visualizations, filter_key):
+    """Render the word cloud / word frequency tab"""
+    # Display word cloud if available in visualizations
+    if visualizations and 'wordcloud' in visualizations:
+        try:
+            st.image(visualizations['wordcloud'], caption="Word Cloud of All Comments", use_column_width=True)
+        except Exception as e:
+            st.error(f"Could not display word cloud: {str(e)}")
+    elif visualizations and 'wordcloud_error' in visualizations:
+        st.error(f"Could not display word cloud: {visualizations['wordcloud_error']}")
+    else:
+        # Generate simple word frequency if comment data is available
+        if 'comment' in filtered_df.columns:
+            st.markdown("### 🔤 Most Common Words")
+            
+            # Simple word frequency analysis
+            word_freq = top_words(filtered_df['comment'], filter_key, 20)
+            
+            if not word_freq.empty:
+                st.plotly_chart(build_word_bar(word_freq), use_container_width=True)
+            else:
+                st.warning("No word frequency data available")
+        else:
+            st.warning("No comment text available for word analysis")
+
+def render_explorer_tab(filtered_df, derived):
+    """Render the data explorer tab"""
+    st.markdown("### 🔍 Data Explorer")
+    
+    # Summary statistics
+    if derived.describe is not None:
+        st.markdown("#### Confidence Score Statistics")
+        score_stats = derived.describe
+        
+        stats_col1, stats_col2, stats_col3 = st.columns(3)
+        with stats_col1:
+            st.metric("Mean", f"{score_stats['mean']:.3f}")
+            st.metric("Min", f"{score_stats['min']:.3f}")
+        with stats_col2:
+            st.metric("Median", f"{score_stats['50%']:.3f}")
+            st.metric("Max", f"{score_stats['max']:.3f}")
+        with stats_col3:
+            st.metric("Std Dev", f"{score_stats['std']:.3f}")
+            st.metric("Count", f"{int(score_stats['count'])}")
+    
+    # Sample comments by sentiment
+    if 'sentiment_label' in filtered_df.columns and 'comment' in filtered_df.columns:
+        st.markdown("#### Sample Comments by Sentiment")
+        
+        for sentiment in filtered_df['sentiment_label'].unique():
+            with st.expander(f"Sample {sentiment} Comments"):
+                sentiment_comments = filtered_df[filtered_df['sentiment_label'] == sentiment]['comment'].head(5)
+                st.table(sentiment_comments.reset_index(drop=True).rename(lambda i: i + 1).to_frame('comment'))
+
+@st.fragment
+def render_visualizations(filtered_df, derived, visualizations, filter_key):
+    """Render the selected visualization view"""
+    # Switching views reruns only this fragment and builds only the chosen view
+    view = st.radio(
+        "View",
+        ["📊 Sentiment Distribution", "📉 Confidence Scores", "☁️ Word Cloud", "🔍 Data Explorer"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="visualization_view"
+    )
+    
+    if view == "📊 Sentiment Distribution":
+        render_sentiment_tab(derived)
+    elif view == "📉 Confidence Scores":
+        render_scores_tab(derived)
+    elif view == "☁️ Word Cloud":
+        render_words_tab(filtered_df, visualizations, filter_key)
+    else:
+        render_explorer_tab(filtered_df, derived)
+
 # Function to load and display results
-def display_analysis_results(results_data, df=None):
+def display_analysis_results(results_data, df=None, data_key=None):
     """Display comprehensive analysis results"""
     
-    # Extract data if from JSON format
+    # Extract summaries if from JSON format
     if isinstance(results_data, dict):
-        if 'data' in results_data:
-            df = pd.DataFrame(results_data['data'])
         metadata = results_data.get('metadata', {})
         sentiment_analysis = results_data.get('sentiment_analysis', {})
         visualizations = results_data.get('visualizations', {})
@@ -113,7 +514,7 @@ def display_analysis_results(results_data, df=None):
         
         with info_col1:
             if 'analysis_date' in metadata:
-                analysis_date = datetime.fromisoformat(metadata['analysis_date'].replace('Z', '+00:00'))
+                analysis_date = metadata['analysis_date']
                 st.info(f"**Analysis Date:** {analysis_date.strftime('%Y-%m-%d %H:%M:%S')}")
             
         with info_col2:
@@ -131,10 +532,11 @@ def display_analysis_results(results_data, df=None):
             
             with filter_col1:
                 if 'sentiment_label' in df.columns:
+                    labels = df['sentiment_label'].cat.categories.tolist()
                     sentiment_filter = st.multiselect(
                         "Filter by Sentiment", 
-                        options=df['sentiment_label'].unique(),
-                        default=df['sentiment_label'].unique()
+                        options=labels,
+                        default=labels
                     )
                 else:
                     sentiment_filter = None
@@ -151,147 +553,36 @@ def display_analysis_results(results_data, df=None):
                 else:
                     min_confidence = 0.0
         
-        # Apply filters
-        filtered_df = df.copy()
-        if sentiment_filter and 'sentiment_label' in df.columns:
-            filtered_df = filtered_df[filtered_df['sentiment_label'].isin(sentiment_filter)]
-        if 'sentiment_score' in df.columns:
-            filtered_df = filtered_df[filtered_df['sentiment_score'] >= min_confidence]
+        # Apply filters - combine boolean masks and index once, skipping filters that keep every row
+        mask = np.ones(len(df), dtype=bool)
+        filtered = False
+        if sentiment_filter and set(sentiment_filter) != set(labels):
+            mask &= df['sentiment_label'].isin(set(sentiment_filter)).to_numpy()
+            filtered = True
+        if 'sentiment_score' in df.columns and (min_confidence > 0.0 or df.attrs.get('score_has_nans', True)):
+            mask &= (df['sentiment_score'] >= min_confidence).to_numpy(dtype=bool, na_value=False)
+            filtered = True
+        filtered_df = df.loc[mask] if filtered else df
+        filter_key = (data_key, tuple(sorted(sentiment_filter)) if sentiment_filter else (), min_confidence)
         
         st.write(f"Showing {len(filtered_df)} of {len(df)} comments")
-        st.dataframe(filtered_df, use_container_width=True)
+        display_dataframe_quickly(filtered_df)
         
         # Visualizations
         st.markdown("## 📈 Data Visualizations")
         
-        tab1, tab2, tab3, tab4 = st.tabs(["📊 Sentiment Distribution", "📉 Confidence Scores", "☁️ Word Cloud", "🔍 Data Explorer"])
-        
-        with tab1:
-            if 'sentiment_label' in filtered_df.columns:
-                sentiment_counts = filtered_df['sentiment_label'].value_counts()
-                
-                # Interactive bar chart
-                fig = px.bar(
-                    x=sentiment_counts.index,
-                    y=sentiment_counts.values,
-                    title="Sentiment Distribution",
-                    color=sentiment_counts.values,
-                    color_continuous_scale="viridis",
-                    labels={'x': 'Sentiment', 'y': 'Count'}
-                )
-                fig.update_layout(showlegend=False)
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Pie chart
-                fig_pie = px.pie(
-                    values=sentiment_counts.values,
-                    names=sentiment_counts.index,
-                    title="Sentiment Proportion"
-                )
-                st.plotly_chart(fig_pie, use_container_width=True)
-            else:
-                st.warning("No sentiment data available for visualization")
-        
-        with tab2:
-            if 'sentiment_score' in filtered_df.columns:
-                # Histogram of confidence scores
-                fig = px.histogram(
-                    filtered_df,
-                    x='sentiment_score',
-                    nbins=20,
-                    title="Distribution of Confidence Scores",
-                    labels={'sentiment_score': 'Confidence Score', 'count': 'Frequency'}
-                )
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Box plot by sentiment
-                if 'sentiment_label' in filtered_df.columns:
-                    fig_box = px.box(
-                        filtered_df,
-                        x='sentiment_label',
-                        y='sentiment_score',
-                        title="Confidence Scores by Sentiment",
-                        labels={'sentiment_label': 'Sentiment', 'sentiment_score': 'Confidence Score'}
-                    )
-                    st.plotly_chart(fig_box, use_container_width=True)
-            else:
-                st.warning("No confidence score data available")
-        
-        with tab3:
-            # Display word cloud if available in visualizations
-            if visualizations and 'wordcloud' in visualizations:
-                try:
-                    wordcloud_data = base64.b64decode(visualizations['wordcloud'])
-                    st.image(wordcloud_data, caption="Word Cloud of All Comments", use_column_width=True)
-                except Exception as e:
-                    st.error(f"Could not display word cloud: {str(e)}")
-            else:
-                # Generate simple word frequency if comment data is available
-                if 'comment' in filtered_df.columns:
-                    st.markdown("### 🔤 Most Common Words")
-                    
-                    # Simple word frequency analysis
-                    all_text = " ".join(filtered_df['comment'].astype(str))
-                    words = all_text.lower().split()
-                    
-                    # Remove common stop words
-                    stop_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during', 'before', 'after', 'above', 'below', 'between', 'among', 'through', 'during', 'before', 'after', 'above', 'below', 'between'}
-                    words = [word for word in words if word not in stop_words and len(word) > 2]
-                    
-                    word_freq = pd.Series(words).value_counts().head(20)
-                    
-                    if not word_freq.empty:
-                        fig = px.bar(
-                            x=word_freq.values,
-                            y=word_freq.index,
-                            orientation='h',
-                            title="Top 20 Most Common Words",
-                            labels={'x': 'Frequency', 'y': 'Words'}
-                        )
-                        fig.update_layout(height=600)
-                        st.plotly_chart(fig, use_container_width=True)
-                    else:
-                        st.warning("No word frequency data available")
-                else:
-                    st.warning("No comment text available for word analysis")
+        derived = compute_derived(filtered_df, filter_key)
         
-        with tab4:
-            st.markdown("### 🔍 Data Explorer")
-            
-            # Summary statistics
-            if 'sentiment_score' in filtered_df.columns:
-                st.markdown("#### Confidence Score Statistics")
-                score_stats = filtered_df['sentiment_score'].describe()
-                
-                stats_col1, stats_col2, stats_col3 = st.columns(3)
-                with stats_col1:
-                    st.metric("Mean", f"{score_stats['mean']:.3f}")
-                    st.metric("Min", f"{score_stats['min']:.3f}")
-                with stats_col2:
-                    st.metric("Median", f"{score_stats['50%']:.3f}")
-                    st.metric("Max", f"{score_stats['max']:.3f}")
-                with stats_col3:
-                    st.metric("Std Dev", f"{score_stats['std']:.3f}")
-                    st.metric("Count", f"{int(score_stats['count'])}")
-            
-            # Sample comments by sentiment
-            if 'sentiment_label' in filtered_df.columns and 'comment' in filtered_df.columns:
-                st.markdown("#### Sample Comments by Sentiment")
-                
-                for sentiment in filtered_df['sentiment_label'].unique():
-                    with st.expander(f"Sample {sentiment} Comments"):
-                        sentiment_comments = filtered_df[filtered_df['sentiment_label'] == sentiment]['comment'].head(5)
-                        for i, comment in enumerate(sentiment_comments, 1):
-                            st.write(f"**{i}.** {comment}")
+        render_visualizations(filtered_df, derived, visualizations, filter_key)
         
         # Download Options
         st.markdown("## 💾 Download Options")
         
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
         
         with col1:
             # Download filtered results
-            csv_data = filtered_df.to_csv(index=False).encode('utf-8')
+            csv_data = to_csv_bytes(filtered_df, filter_key)
             st.download_button(
                 label="📥 Download Filtered Results (CSV)",
                 data=csv_data,
@@ -302,7 +593,7 @@ def display_analysis_results(results_data, df=None):
         
         with col2:
             # Download full results
-            full_csv_data = df.to_csv(index=False).encode('utf-8')
+            full_csv_data = to_csv_bytes(df, data_key)
             st.download_button(
                 label="📥 Download Full Results (CSV)",
                 data=full_csv_data,
@@ -310,6 +601,24 @@ def display_analysis_results(results_data, df=None):
                 mime="text/csv",
                 use_container_width=True
             )
+        
+        with col3:
+            # Download aggregates of the filtered results
+            st.download_button(
+                label="📥 Download Aggregates Only (JSON)",
+                data=aggregates_to_json(derived),
+                file_name=f"analysis_aggregates_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                mime="application/json",
+                use_container_width=True
+            )
+
+def render_welcome():
+    """Render the welcome screen shown before any results are uploaded"""
+    st.markdown(WELCOME_MARKDOWN)
+    
+    # Sample data format
+    st.markdown("### 📄 Expected Data Format")
+    st.dataframe(SAMPLE_DATA, use_container_width=True)
 
 # Main app logic
 def main():
@@ -318,9 +627,9 @@ def main():
     if uploaded_json is not None:
         try:
             # Load JSON results
-            json_data = json.load(uploaded_json)
+            json_data, df = load_uploaded(uploaded_json, load_json_results)
             st.success("✅ JSON analysis results loaded successfully!")
-            display_analysis_results(json_data)
+            display_analysis_results(json_data, df, data_key=uploaded_json.file_id)
             
         except Exception as e:
             st.error(f"❌ Error loading JSON file: {str(e)}")
@@ -328,97 +637,26 @@ def main():
     elif uploaded_csv is not None:
         try:
             # Load CSV results
-            df = pd.read_csv(uploaded_csv)
+            df, (metadata, sentiment_analysis) = load_uploaded(uploaded_csv, load_csv_results)
             st.success(f"✅ CSV results loaded successfully! ({len(df)} rows)")
             
-            # Create basic metadata
-            metadata = {
-                'total_comments': len(df),
-                'analysis_date': datetime.now().isoformat()
-            }
-            
-            # Calculate sentiment analysis summary if available
-            sentiment_analysis = {}
-            if 'sentiment_label' in df.columns:
-                sentiment_counts = df['sentiment_label'].value_counts()
-                total = len(df)
-                sentiment_analysis = {
-                    'distribution': sentiment_counts.to_dict(),
-                    'average_confidence': df['sentiment_score'].mean() if 'sentiment_score' in df.columns else 0,
-                    'positive_percentage': (sentiment_counts.get('POSITIVE', sentiment_counts.get('positive', 0)) / total) * 100,
-                    'negative_percentage': (sentiment_counts.get('NEGATIVE', sentiment_counts.get('negative', 0)) / total) * 100
-                }
-            
             results_data = {
                 'metadata': metadata,
-                'sentiment_analysis': sentiment_analysis,
-                'data': df.to_dict(orient='records')
+                'sentiment_analysis': sentiment_analysis
             }
             
-            display_analysis_results(results_data, df)
+            display_analysis_results(results_data, df, data_key=uploaded_csv.file_id)
             
         except Exception as e:
             st.error(f"❌ Error loading CSV file: {str(e)}")
     
     else:
-        # Welcome screen
-        st.markdown("""
-        ## 🚀 Welcome to the Comment Analysis Dashboard!
-        
-        This dashboard displays results from sentiment analysis processed in Google Colab.
+        # Release any previously loaded upload
+        st.session_state.pop('loaded_data', None)
+        st.session_state.pop('loaded_id', None)
         
-        ### 📋 How to Use:
-        
-        1. **Process your data in Google Colab** using the provided notebook
-        2. **Download the results** (JSON or CSV format)  
-        3. **Upload the results** using the sidebar file uploader
-        4. **Explore your analysis** with interactive visualizations
-        
-        ### 📁 Supported File Formats:
-        
-        - **JSON**: Complete analysis report with visualizations (recommended)
-        - **CSV**: Processed data with sentiment scores and summaries
-        
-        ### 🎯 What You'll Get:
-        
-        - 📊 **Interactive dashboards** with key metrics
-        - 📈 **Dynamic visualizations** (charts, graphs, word clouds)
-        - 🔍 **Data filtering** and exploration tools  
-        - 💾 **Download options** for filtered results
-        - 📋 **Detailed statistics** and sample data
-        
-        ### 🔄 Colab + Streamlit Pipeline Benefits:
-        
-        ✅ **Fast processing** - Heavy ML work done in Colab with GPU support  
-        ✅ **Quick deployment** - Lightweight Streamlit app loads instantly  
-        ✅ **No timeouts** - Pre-processed data means no waiting  
-        ✅ **Easy sharing** - Share results without re-processing  
-        ✅ **Cost effective** - Free Colab processing + free Streamlit hosting  
-        
-        ---
-        
-        **Ready to get started?** Upload your analysis results using the sidebar! 👈
-        """)
-        
-        # Sample data format
-        st.markdown("### 📄 Expected Data Format")
-        
-        sample_data = pd.DataFrame({
-            'comment': [
-                'This product is amazing! Highly recommend it.',
-                'Not satisfied with the quality. Could be better.',  
-                'Great customer service and fast delivery.'
-            ],
-            'sentiment_label': ['POSITIVE', 'NEGATIVE', 'POSITIVE'],
-            'sentiment_score': [0.995, 0.892, 0.967],
-            'summary': [
-                'Product is amazing and recommended.',
-                'Quality not satisfactory, needs improvement.',
-                'Great service and fast delivery.'
-            ]
-        })
-        
-        st.dataframe(sample_data, use_container_width=True)
+        # Welcome screen
+        render_welcome()
 
 if __name__ == "__main__":
     main()